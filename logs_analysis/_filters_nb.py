@@ -0,0 +1,228 @@
+# Numba-compiled Mahony / Madgwick kernels.
+#
+# The per-sample `updateIMU` loops of the ahrs library are pure Python and
+# dominate the runtime of every log script. These kernels inline the same
+# quaternion math in scalar form and process whole sample streams in one
+# call, returning the (N, 4) quaternion trajectory.
+#
+# Sensor data is passed as six separate C-contiguous 1-D columns (SoA
+# layout) rather than an (N, 3) array: the inner loop then reads
+# unit-stride from each stream, which halves the bytes fetched per
+# iteration with float32 columns and keeps the prefetcher happy.
+
+import numpy as np
+from numba import njit, prange
+
+
+def _col(a):
+    # Parquet-backed frames can hand out read-only views; the explicit
+    # kernel signatures require writable C-contiguous float32.
+    c = np.ascontiguousarray(a, dtype=np.float32)
+    return c if c.flags.writeable else c.copy()
+
+
+def soa(arr):
+    """Split an (N, 3) array into three C-contiguous float32 columns."""
+    return _col(arr[:, 0]), _col(arr[:, 1]), _col(arr[:, 2])
+
+
+def soa_unit(arr):
+    """soa() plus row normalization, in one vectorized pass.
+
+    The filter kernels expect unit accelerometer vectors, so the
+    per-sample norm + divide is hoisted here. Zero-norm rows are passed
+    through as zeros, which the kernels treat as missing samples.
+    """
+    x, y, z = soa(arr)
+    norm = np.sqrt(x * x + y * y + z * z)
+    inv = np.zeros_like(norm)
+    np.divide(1.0, norm, out=inv, where=norm > 0.0)
+    return x * inv, y * inv, z * inv
+
+
+def quats_to_euler_zyx(q):
+    """Vectorized quaternion → intrinsic ZYX Euler angles.
+
+    `q` is a (..., 4) array in ahrs ordering [w, x, y, z] — a single
+    (N, 4) trajectory or a whole (K, N, 4) batch. Returns a (..., 3)
+    array of [roll, pitch, yaw] in radians, computed in one pass of
+    ufuncs instead of a scipy Rotation (or per-sample q2euler)
+    roundtrip.
+    """
+    w, x, y, z = np.moveaxis(q, -1, 0)
+    roll = np.arctan2(2.0 * (w * x + y * z), 1.0 - 2.0 * (x * x + y * y))
+    pitch = np.arcsin(np.clip(2.0 * (w * y - z * x), -1.0, 1.0))
+    yaw = np.arctan2(2.0 * (w * z + x * y), 1.0 - 2.0 * (y * y + z * z))
+    return np.stack([roll, pitch, yaw], axis=-1)
+
+
+@njit(cache=True, fastmath=True, inline="always")
+def _q_prod_vec(qw, qx, qy, qz, vx, vy, vz):
+    """Hamilton product q ⊗ (0, v).
+
+    Specialization of the general 16-multiply product for a
+    pure-imaginary right operand (the corrected gyro rate): 12
+    multiplies and 8 adds.
+    """
+    return (-qx * vx - qy * vy - qz * vz,
+            qw * vx + qy * vz - qz * vy,
+            qw * vy - qx * vz + qz * vx,
+            qw * vz + qx * vy - qy * vx)
+
+
+@njit("float32[:, ::1](float32[::1], float32[::1], float32[::1], "
+      "float32[::1], float32[::1], float32[::1], float64, float64, float64)",
+      cache=True, fastmath=True)
+def mahony_run(gx, gy, gz, ax, ay, az, dt, kp, ki):
+    """Run the Mahony IMU filter over all samples.
+
+    Same update as ahrs.filters.Mahony.updateIMU, starting from the
+    identity quaternion: gravity estimate from the current attitude,
+    cross-product error, bias integration, gyro correction, quaternion
+    integration and renormalization. The whole state loop runs in
+    float32 — the MPU samples carry ~11 effective bits, and the explicit
+    signature keeps float64 literals from promoting the arithmetic.
+    """
+    n = gx.shape[0]
+    quats = np.empty((n, 4), dtype=np.float32)
+    zero, half, one, two = (np.float32(0.0), np.float32(0.5),
+                            np.float32(1.0), np.float32(2.0))
+    dtf, kpf, kif = np.float32(dt), np.float32(kp), np.float32(ki)
+    qw, qx, qy, qz = one, zero, zero, zero
+    bx, by, bz = zero, zero, zero
+    for i in range(n):
+        wx, wy, wz = gx[i], gy[i], gz[i]
+        if wx * wx + wy * wy + wz * wz > zero:
+            axi, ayi, azi = ax[i], ay[i], az[i]
+            # acc is pre-normalized (soa_unit); all-zero rows are missing
+            if axi != zero or ayi != zero or azi != zero:
+                # Expected gravity in the sensor frame
+                vx = two * (qx * qz - qw * qy)
+                vy = two * (qw * qx + qy * qz)
+                vz = qw * qw - qx * qx - qy * qy + qz * qz
+                # Error: cross product a × v
+                ex = ayi * vz - azi * vy
+                ey = azi * vx - axi * vz
+                ez = axi * vy - ayi * vx
+                # Bias estimate and gyro correction
+                bx -= kif * ex * dtf
+                by -= kif * ey * dtf
+                bz -= kif * ez * dtf
+                wx += kpf * ex - bx
+                wy += kpf * ey - by
+                wz += kpf * ez - bz
+            # Quaternion integration: q += 0.5 * q ⊗ (0, w) * dt
+            dw, dx, dy, dz = _q_prod_vec(qw, qx, qy, qz, wx, wy, wz)
+            qw += half * dw * dtf
+            qx += half * dx * dtf
+            qy += half * dy * dtf
+            qz += half * dz * dtf
+            inv_n = one / np.sqrt(qw * qw + qx * qx + qy * qy + qz * qz)
+            qw *= inv_n
+            qx *= inv_n
+            qy *= inv_n
+            qz *= inv_n
+        quats[i, 0] = qw
+        quats[i, 1] = qx
+        quats[i, 2] = qy
+        quats[i, 3] = qz
+    return quats
+
+
+@njit("float32[:, ::1](float32[::1], float32[::1], float32[::1], "
+      "float32[::1], float32[::1], float32[::1], float64, float64)",
+      cache=True, fastmath=True)
+def madgwick_run(gx, gy, gz, ax, ay, az, dt, beta):
+    """Run the Madgwick IMU filter over all samples.
+
+    Same update as ahrs.filters.Madgwick.updateIMU, starting from the
+    identity quaternion: gyroscope quaternion derivative corrected by the
+    normalized gradient of the gravity objective function. Float32
+    throughout, like `mahony_run`.
+    """
+    n = gx.shape[0]
+    quats = np.empty((n, 4), dtype=np.float32)
+    zero, half, one, two, four = (np.float32(0.0), np.float32(0.5),
+                                  np.float32(1.0), np.float32(2.0),
+                                  np.float32(4.0))
+    dtf, betaf = np.float32(dt), np.float32(beta)
+    qw, qx, qy, qz = one, zero, zero, zero
+    for i in range(n):
+        wx, wy, wz = gx[i], gy[i], gz[i]
+        if wx * wx + wy * wy + wz * wz > zero:
+            dw, dx, dy, dz = _q_prod_vec(qw, qx, qy, qz, wx, wy, wz)
+            dw *= half
+            dx *= half
+            dy *= half
+            dz *= half
+            axi, ayi, azi = ax[i], ay[i], az[i]
+            # acc is pre-normalized (soa_unit); all-zero rows are missing
+            if axi != zero or ayi != zero or azi != zero:
+                # Objective function: predicted gravity minus measurement
+                fx = two * (qx * qz - qw * qy) - axi
+                fy = two * (qw * qx + qy * qz) - ayi
+                fz = two * (half - qx * qx - qy * qy) - azi
+                if fx * fx + fy * fy + fz * fz > zero:
+                    # Gradient: J^T f
+                    sw = -two * qy * fx + two * qx * fy
+                    sx = two * qz * fx + two * qw * fy - four * qx * fz
+                    sy = -two * qw * fx + two * qz * fy - four * qy * fz
+                    sz = two * qx * fx + two * qy * fy
+                    inv_s = one / np.sqrt(sw * sw + sx * sx + sy * sy + sz * sz)
+                    dw -= betaf * sw * inv_s
+                    dx -= betaf * sx * inv_s
+                    dy -= betaf * sy * inv_s
+                    dz -= betaf * sz * inv_s
+            qw += dw * dtf
+            qx += dx * dtf
+            qy += dy * dtf
+            qz += dz * dtf
+            inv_n = one / np.sqrt(qw * qw + qx * qx + qy * qy + qz * qz)
+            qw *= inv_n
+            qx *= inv_n
+            qy *= inv_n
+            qz *= inv_n
+        quats[i, 0] = qw
+        quats[i, 1] = qx
+        quats[i, 2] = qy
+        quats[i, 3] = qz
+    return quats
+
+
+@njit("float32[:, :, ::1](float32[::1], float32[::1], float32[::1], "
+      "float32[::1], float32[::1], float32[::1], float64, float64[::1])",
+      cache=True, fastmath=True, parallel=True)
+def madgwick_sweep(gx, gy, gz, ax, ay, az, dt, betas):
+    """Run the Madgwick filter once per beta value, in parallel.
+
+    Same sensor stream for every run; `betas` is a 1-D array of gains.
+    Returns (len(betas), N, 4) quaternions.
+    """
+    out = np.empty((betas.shape[0], gx.shape[0], 4), dtype=np.float32)
+    for k in prange(betas.shape[0]):
+        out[k] = madgwick_run(gx, gy, gz, ax, ay, az, dt, betas[k])
+    return out
+
+
+@njit("float32[:, :, ::1](float32[:, :, ::1], float32[:, :, ::1], "
+      "float64, float64, float64)",
+      cache=True, fastmath=True, parallel=True)
+def mahony_batch(gyr_all, acc_all, dt, kp, ki):
+    """Run the Mahony filter over a batch of independent streams.
+
+    `gyr_all` and `acc_all` are (K, 3, N) stacks of K data-parallel
+    streams in SoA layout (e.g. the 48 candidate alignments in
+    calib.py), so each component row is contiguous. Accelerometer
+    streams must be pre-normalized, like the `soa_unit` inputs of
+    `mahony_run`. The K axis is
+    distributed over threads with prange; each stream runs the same
+    scalar kernel as `mahony_run`. Returns (K, N, 4) quaternions.
+    """
+    k_streams = gyr_all.shape[0]
+    n = gyr_all.shape[2]
+    out = np.empty((k_streams, n, 4), dtype=np.float32)
+    for k in prange(k_streams):
+        out[k] = mahony_run(gyr_all[k, 0], gyr_all[k, 1], gyr_all[k, 2],
+                            acc_all[k, 0], acc_all[k, 1], acc_all[k, 2],
+                            dt, kp, ki)
+    return out
@@ -0,0 +1,112 @@
+# Numba kernel for the vendored ROLEQ filter (roleq.py).
+#
+# ahrs' ROLEQ._compute_all loops over samples in Python, allocating
+# fresh 4x4 matrices (Omega_t, M1, M2, M3, identity) in every call of
+# attitude_propagation / WW / oleq. Here the whole per-sample update is
+# expanded to scalar multiply-adds and run over the full stream in one
+# jitted call, writing into a preallocated (N, 4) output.
+
+import numpy as np
+from numba import njit
+
+
+@njit(cache=True, fastmath=True, inline="always")
+def _attitude_propagate(qw, qx, qy, qz, wx, wy, wz, half_dt):
+    """q_omega = (I₄ + Δt/2 · Ω) q, normalized.
+
+    The 4x4 build + matmul of ROLEQ.attitude_propagation collapses to 12
+    multiply-adds once the half-step gyro rates are folded in.
+    """
+    hx, hy, hz = wx * half_dt, wy * half_dt, wz * half_dt
+    nw = qw - hx * qx - hy * qy - hz * qz
+    nx = qx + hx * qw - hy * qz + hz * qy
+    ny = qy + hx * qz + hy * qw - hz * qx
+    nz = qz - hx * qy + hy * qx + hz * qw
+    inv = 1.0 / np.sqrt(nw * nw + nx * nx + ny * ny + nz * nz)
+    return nw * inv, nx * inv, ny * inv, nz * inv
+
+
+@njit(cache=True, fastmath=True, inline="always")
+def _w_entries(bx, by, bz, rx, ry, rz):
+    """The 10 unique entries of the symmetric W = rx·M1 + ry·M2 + rz·M3."""
+    w00 = rx * bx + ry * by + rz * bz
+    w01 = rz * by - ry * bz
+    w02 = rx * bz - rz * bx
+    w03 = ry * bx - rx * by
+    w11 = rx * bx - ry * by - rz * bz
+    w12 = rx * by + ry * bx
+    w13 = rx * bz + rz * bx
+    w22 = ry * by - rx * bx - rz * bz
+    w23 = ry * bz + rz * by
+    w33 = rz * bz - rx * bx - ry * by
+    return w00, w01, w02, w03, w11, w12, w13, w22, w23, w33
+
+
+@njit(cache=True, fastmath=True, inline="always")
+def _apply_W(qw, qx, qy, qz, ax, ay, az, mx, my, mz,
+             arx, ary, arz, mrx, mry, mrz, a0, a1):
+    """Normalized R @ q_omega with R = ½(I₄ + a0·W_acc + a1·W_mag).
+
+    `ax..mz` are the normalized measurements, `arx..mrz` the reference
+    vectors. The W sum is expanded symbolically (W is symmetric, so 10
+    entries per sensor) and applied to q as 16 scalar FMAs — no matrix
+    is ever materialized.
+    """
+    aw00, aw01, aw02, aw03, aw11, aw12, aw13, aw22, aw23, aw33 = \
+        _w_entries(ax, ay, az, arx, ary, arz)
+    mw00, mw01, mw02, mw03, mw11, mw12, mw13, mw22, mw23, mw33 = \
+        _w_entries(mx, my, mz, mrx, mry, mrz)
+    r00 = 0.5 * (1.0 + a0 * aw00 + a1 * mw00)
+    r01 = 0.5 * (a0 * aw01 + a1 * mw01)
+    r02 = 0.5 * (a0 * aw02 + a1 * mw02)
+    r03 = 0.5 * (a0 * aw03 + a1 * mw03)
+    r11 = 0.5 * (1.0 + a0 * aw11 + a1 * mw11)
+    r12 = 0.5 * (a0 * aw12 + a1 * mw12)
+    r13 = 0.5 * (a0 * aw13 + a1 * mw13)
+    r22 = 0.5 * (1.0 + a0 * aw22 + a1 * mw22)
+    r23 = 0.5 * (a0 * aw23 + a1 * mw23)
+    r33 = 0.5 * (1.0 + a0 * aw33 + a1 * mw33)
+    nw = r00 * qw + r01 * qx + r02 * qy + r03 * qz
+    nx = r01 * qw + r11 * qx + r12 * qy + r13 * qz
+    ny = r02 * qw + r12 * qx + r22 * qy + r23 * qz
+    nz = r03 * qw + r13 * qx + r23 * qy + r33 * qz
+    inv = 1.0 / np.sqrt(nw * nw + nx * nx + ny * ny + nz * nz)
+    return nw * inv, nx * inv, ny * inv, nz * inv
+
+
+@njit(cache=True, fastmath=True)
+def _compute_all_nb(gx, gy, gz, axs, ays, azs, mxs, mys, mzs,
+                    a_ref, m_ref, a, dt, Q):
+    """Run the ROLEQ update over all samples.
+
+    The sensor streams come in as nine contiguous 1-D columns (SoA
+    layout, like the _filters_nb kernels), so every read in the loop is
+    unit-stride. Q[0] must already hold the initial quaternion; the
+    remaining rows are filled in place. Same update as ROLEQ.update:
+    attitude propagation from the gyro, then the single-multiplication
+    OLEQ correction. Zero-norm acc or mag samples skip the correction.
+    """
+    half_dt = 0.5 * dt
+    arx, ary, arz = a_ref[0], a_ref[1], a_ref[2]
+    mrx, mry, mrz = m_ref[0], m_ref[1], m_ref[2]
+    a0, a1 = a[0], a[1]
+    qw, qx, qy, qz = Q[0, 0], Q[0, 1], Q[0, 2], Q[0, 3]
+    for t in range(1, Q.shape[0]):
+        qw, qx, qy, qz = _attitude_propagate(
+            qw, qx, qy, qz, gx[t], gy[t], gz[t], half_dt)
+        ax, ay, az = axs[t], ays[t], azs[t]
+        mx, my, mz = mxs[t], mys[t], mzs[t]
+        s2a = ax * ax + ay * ay + az * az
+        s2m = mx * mx + my * my + mz * mz
+        if s2a > 0.0 and s2m > 0.0:
+            ra = 1.0 / np.sqrt(s2a)
+            rm = 1.0 / np.sqrt(s2m)
+            qw, qx, qy, qz = _apply_W(
+                qw, qx, qy, qz, ax * ra, ay * ra, az * ra,
+                mx * rm, my * rm, mz * rm,
+                arx, ary, arz, mrx, mry, mrz, a0, a1)
+        Q[t, 0] = qw
+        Q[t, 1] = qx
+        Q[t, 2] = qy
+        Q[t, 3] = qz
+    return Q
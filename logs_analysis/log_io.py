@@ -0,0 +1,45 @@
+# Shared MPU log loading for the analysis scripts.
+#
+# Parsing the CSV (plus the per-column to_numeric pass) dominates the
+# cold-start time of every script during edit/run iterations. load_log
+# caches the cleaned, unit-converted frame as Parquet next to the CSV, so
+# every load after the first is a plain columnar read.
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+COLUMNS = ["time", "ax", "ay", "az", "gx", "gy", "gz"]
+
+# The only non-numeric rows in the logs are header lines repeated each
+# time the Arduino logger restarts; mapping their tokens to NaN lets the
+# C parser produce typed columns directly, with no per-column to_numeric
+# pass.
+_HEADER_TOKENS = ["time_ms", "ax", "ay", "az", "gx", "gy", "gz"]
+
+_DTYPES = {
+    "time": "float64",
+    "ax": "float32", "ay": "float32", "az": "float32",
+    "gx": "float32", "gy": "float32", "gz": "float32",
+}
+
+
+def load_log(path):
+    """Load an MPU log CSV, with a Parquet cache.
+
+    The first call parses the CSV with explicit dtypes (float32 sensor
+    columns), drops the repeated header rows, converts time to seconds
+    and gyro rates to rad/s, then writes a Parquet copy next to the CSV.
+    Subsequent calls read the Parquet file directly.
+    """
+    path = Path(path)
+    cache = path.with_suffix(".parquet")
+    if cache.exists():
+        return pd.read_parquet(cache)
+    df = pd.read_csv(path, names=COLUMNS, dtype=_DTYPES,
+                     na_values=_HEADER_TOKENS, engine="c").dropna()
+    df["time"] /= 1000.0  # ms -> s
+    df[["gx", "gy", "gz"]] *= np.float32(np.pi / 180.0)  # °/s -> rad/s
+    df.to_parquet(cache, compression="zstd")
+    return df
@@ -1,39 +1,36 @@
-import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
-from ahrs.filters import Madgwick
-from ahrs.common.orientation import q2euler
+from _filters_nb import madgwick_sweep, quats_to_euler_zyx, soa, soa_unit
+from log_io import load_log
 
 # === Data Loading and Cleaning ===
-df = pd.read_csv("logs/MPU_LOGS_PART_1.csv", names=["time", "ax", "ay", "az", "gx", "gy", "gz"])
-df = df.apply(pd.to_numeric, errors="coerce").dropna()
-df["time"] /= 1000.0  # ms -> s
-df[["gx", "gy", "gz"]] *= np.pi / 180.0  # °/s -> rad/s
+df = load_log("logs/MPU_LOGS_PART_1.csv")
 
 # === Data Extraction ===
 acc, gyr = df[["ax", "ay", "az"]].to_numpy(), df[["gx", "gy", "gz"]].to_numpy()
 
-# === Function to Apply Madgwick Filter ===
-def apply_madgwick(beta):
-    madgwick = Madgwick(sampleperiod=np.mean(np.diff(df["time"])), beta=beta)
-    quats = np.zeros((len(df), 4))
-    q = np.array([1.0, 0.0, 0.0, 0.0])
-    for i in range(len(df)):
-        q = madgwick.updateIMU(q, gyr[i], acc[i])
-        quats[i] = q
-    euler = np.array([np.degrees(q2euler(q)) for q in quats])  # roll, pitch, yaw
-    return euler
+# === Apply Madgwick Filter: all beta values in one batched call ===
+beta_values = [2.5]  # Different beta parameters
+times = df["time"].to_numpy()
+dt = (times[-1] - times[0]) / (len(times) - 1)  # fixed-rate log: O(1)
+quats_all = madgwick_sweep(*soa(gyr), *soa_unit(acc), dt, np.asarray(beta_values))
 
 # === Plotly Visualization ===
+# Collect every trace and submit them in one add_traces call (a single
+# validation pass); Scattergl renders the long series through WebGL
 fig = go.Figure()
-beta_values = [2.5]  # Different beta parameters
+traces = []
 
-for beta in beta_values:
-    euler = apply_madgwick(beta)
+for beta, quats in zip(beta_values, quats_all):
+    euler = np.degrees(quats_to_euler_zyx(quats))  # roll, pitch, yaw
     roll, pitch, yaw = euler[:, 0], euler[:, 1], euler[:, 2]
-    fig.add_trace(go.Scatter(x=df["time"], y=roll, mode="lines", name=f"Roll (β={beta})"))
-    fig.add_trace(go.Scatter(x=df["time"], y=pitch, mode="lines", name=f"Pitch (β={beta})"))
-    fig.add_trace(go.Scatter(x=df["time"], y=yaw, mode="lines", name=f"Yaw (β={beta})"))
+    traces += [
+        go.Scattergl(x=times, y=roll, mode="lines", name=f"Roll (β={beta})"),
+        go.Scattergl(x=times, y=pitch, mode="lines", name=f"Pitch (β={beta})"),
+        go.Scattergl(x=times, y=yaw, mode="lines", name=f"Yaw (β={beta})"),
+    ]
+
+fig.add_traces(traces)
 
 # Layout
 fig.update_layout(
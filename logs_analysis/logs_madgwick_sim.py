@@ -1,38 +1,28 @@
-import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
-from ahrs.filters import Madgwick
-from ahrs.common.orientation import q2euler
+from _filters_nb import madgwick_run, soa, soa_unit
+from log_io import load_log
 from mpl_toolkits.mplot3d import Axes3D
 from matplotlib.animation import FuncAnimation
 from scipy.spatial.transform import Rotation as R
 
 # === Chargement et nettoyage ===
-df = pd.read_csv("MPU_LOGS.CSV", names=["time", "ax", "ay", "az", "gx", "gy", "gz"])
-df = df.apply(pd.to_numeric, errors="coerce").dropna()  # conversion + suppression NaN
-df["time"] /= 1000.0  # ms -> s
-df[["gx", "gy", "gz"]] *= np.pi / 180.0  # °/s -> rad/s
+df = load_log("MPU_LOGS.CSV")
 
 # === Extraction des données ===
 acc, gyr = df[["ax", "ay", "az"]].to_numpy(), df[["gx", "gy", "gz"]].to_numpy()
 
 # === Filtrage Madgwick ===
-dt = np.mean(np.diff(df["time"]))
-madgwick = Madgwick(sampleperiod=dt, beta = 0.3)
-quats = np.zeros((len(df), 4))
-q = np.array([1.0, 0.0, 0.0, 0.0])
-
-for i in range(len(df)):
-    q = madgwick.updateIMU(q, gyr[i], acc[i])
-    quats[i] = q
-
-# === Angles d'Euler ===
-euler = np.array([np.degrees(q2euler(q)) for q in quats])  # roll, pitch, yaw
-df[["roll", "pitch", "yaw"]] = euler
+times = df["time"].to_numpy()
+dt = (times[-1] - times[0]) / (len(times) - 1)  # cadence fixe : O(1)
+quats = madgwick_run(*soa(gyr), *soa_unit(acc), dt, 0.3)
 
 # === Préparation des quaternions pour scipy ===
 # Reorder quats from [w, x, y, z] → [x, y, z, w]
-scipy_quats = quats[:, [1, 2, 3, 0]]
+scipy_quats = quats[:, [1, 2, 3, 0]].astype(np.float64)  # retour en float64 à la frontière scipy
+# Matrices de rotation (N, 3, 3) précalculées en un seul appel batché ;
+# les lignes de rot_mats[frame].T sont les axes X, Y, Z tournés
+rot_mats = R.from_quat(scipy_quats).as_matrix()
 
 # === Repère de base : X, Y, Z unitaires ===
 origin = np.zeros(3)
@@ -49,28 +39,20 @@ ax.set_ylabel('Y')
 ax.set_zlabel('Z')
 ax.view_init(elev=30, azim=135)  # orientation de vue
 
-# === Fonction d’animation ===
-def update(frame):
-    ax.cla()  # Clear axes
-    ax.set_xlim([-1, 1])
-    ax.set_ylim([-1, 1])
-    ax.set_zlim([-1, 1])
-    ax.set_xlabel('X')
-    ax.set_ylabel('Y')
-    ax.set_zlabel('Z')
-    ax.view_init(elev=30, azim=135)
-    ax.set_title(f"Time : {df['time'].iloc[frame]:.2f} s")
+# === Vecteurs X (rouge), Y (vert), Z (bleu) : artistes persistants ===
+colors = ['r', 'g', 'b']
+quivers = [ax.quiver(*origin, *vec, color=color) for vec, color in zip(axes, colors)]
+title = ax.set_title("")
 
-    # Appliquer la rotation
-    rot = R.from_quat(scipy_quats[frame])
-    rotated_axes = rot.apply(axes)
-
-    # Tracer les vecteurs X (rouge), Y (vert), Z (bleu)
-    colors = ['r', 'g', 'b']
-    for vec, color in zip(rotated_axes, colors):
-        ax.quiver(*origin, *vec, color=color)
+# === Fonction d’animation : mute les artistes au lieu de les recréer ===
+def update(frame):
+    rotated_axes = rot_mats[frame].T
+    for quiver, vec in zip(quivers, rotated_axes):
+        quiver.set_segments([[(0.0, 0.0, 0.0), tuple(vec)]])
+    title.set_text(f"Time : {times[frame]:.2f} s")
+    return (*quivers, title)
 
 # === Animation ===
-ani = FuncAnimation(fig, update, frames=range(0, len(df), 5), interval=30)
+ani = FuncAnimation(fig, update, frames=range(0, len(df), 5), interval=30, blit=True)
 plt.tight_layout()
 plt.show()
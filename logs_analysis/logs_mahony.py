@@ -1,45 +1,20 @@
-import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
-from ahrs.filters import Mahony
-from scipy.spatial.transform import Rotation as R
+from _filters_nb import quats_to_euler_zyx
+from mahony_pipeline import run_mahony_cached
 
-# === Load and clean data ===
-df = pd.read_csv("logs/MPU_LOGS_PART_1.csv", names=["time", "ax", "ay", "az", "gx", "gy", "gz"])
-df = df.apply(pd.to_numeric, errors="coerce").dropna()
-df["time"] /= 1000.0  # ms → s
-df[["gx", "gy", "gz"]] *= np.pi / 180.0  # °/s → rad/s
+# === Load, align and filter (cached) ===
+R_align = (0,  0,  1,
+           0, -1,  0,
+           1,  0,  0)
+times, quats = run_mahony_cached("logs/MPU_LOGS_PART_1.csv", R_align, kp=20.0)
 
-# === Apply alignment matrix ===
-R_align = np.array([
-    [ 0,  0,  1],
-    [ 0, -1,  0],
-    [ 1,  0,  0]
-])
-
-
-# === Rotate sensor data ===
-acc_raw = df[["ax", "ay", "az"]].to_numpy()
-gyr_raw = df[["gx", "gy", "gz"]].to_numpy()
-acc = (R_align @ acc_raw.T).T
-gyr = (R_align @ gyr_raw.T).T
-
-# === Mahony filter ===
-mahony = Mahony(sampleperiod=np.mean(np.diff(df["time"])), kp=20.0)
-quats = np.zeros((len(df), 4))
-q = np.array([1.0, 0.0, 0.0, 0.0])
+# === Convert quaternions to Euler angles ===
 
-for i in range(len(df)):
-    q = mahony.updateIMU(q, gyr[i], acc[i])
-    quats[i] = q
-
-# === Convert quaternions to Euler angles (YXZ ZXY) ===
-
-rot = R.from_quat(quats)
-euler = rot.as_euler('ZXY', degrees=True)
-pitch = np.degrees(np.unwrap(np.radians(euler[:, 0])))
-yaw = np.degrees(np.unwrap(np.radians(euler[:, 1])))
-roll  = np.degrees(np.unwrap(np.radians(euler[:, 2])))
+euler = np.degrees(quats_to_euler_zyx(quats))
+roll = np.unwrap(euler[:, 0], period=360)
+pitch = np.unwrap(euler[:, 1], period=360)
+yaw = np.unwrap(euler[:, 2], period=360)
 
 
 def incl_angle(pitch, roll):
@@ -54,10 +29,12 @@ inclination = incl_angle(pitch, roll)
 
 # === Plot ===
 fig = go.Figure()
-fig.add_trace(go.Scatter(x=df["time"], y=roll, mode="lines", name="Roll"))
-fig.add_trace(go.Scatter(x=df["time"], y=pitch, mode="lines", name="Pitch"))
-fig.add_trace(go.Scatter(x=df["time"], y=yaw, mode="lines", name="Yaw"))
-fig.add_trace(go.Scatter(x=df["time"], y=inclination, mode="lines", name="Inclination"))
+fig.add_traces([
+    go.Scattergl(x=times, y=roll, mode="lines", name="Roll"),
+    go.Scattergl(x=times, y=pitch, mode="lines", name="Pitch"),
+    go.Scattergl(x=times, y=yaw, mode="lines", name="Yaw"),
+    go.Scattergl(x=times, y=inclination, mode="lines", name="Inclination"),
+])
 
 fig.update_layout(
     title="Orientation: Roll, Pitch, Yaw",
@@ -1,12 +1,10 @@
 import numpy as np
-import pandas as pd
 import plotly.graph_objects as go
 
+from log_io import load_log
+
 # === Load and clean data ===
-df = pd.read_csv("logs/MPU_LOGS_PART_2.csv", names=["time", "ax", "ay", "az", "gx", "gy", "gz"])
-df = df.apply(pd.to_numeric, errors="coerce").dropna()
-df["time"] /= 1000.0  # ms → s
-df[["gx", "gy", "gz"]] *= np.pi / 180.0  # °/s → rad/s
+df = load_log("logs/MPU_LOGS_PART_2.csv")
 
 # === Apply alignment matrix ===
 R_align = np.array([
@@ -17,27 +15,31 @@ R_align = np.array([
 
 
 # === Rotate sensor data ===
+# Right-multiplying by R_align.T keeps the (N, 3) output C-contiguous,
+# with no transposed intermediates
 acc_raw = df[["ax", "ay", "az"]].to_numpy()
 gyr_raw = df[["gx", "gy", "gz"]].to_numpy()
-acc = (R_align @ acc_raw.T).T
-gyr = (R_align @ gyr_raw.T).T
+acc = acc_raw @ R_align.T
+gyr = gyr_raw @ R_align.T
 
 # === Compute inclination without filtering ===
+# Normalize the accelerometer once; the inclination is the angle between
+# the measured gravity and the sensor Z axis, arccos(az). No tan, so no
+# blow-up near ±90°.
 
-roll = np.degrees(np.arctan2(acc[:, 1], acc[:, 2]))
-pitch = np.degrees(np.arctan2(-acc[:, 0], np.sqrt(acc[:, 1]**2 + acc[:, 2]**2)))
-
-def incl_angle(pitch, roll):
-    return np.degrees(np.arctan2(np.sqrt(np.tan(np.radians(pitch))**2 + np.tan(np.radians(roll))**2), 1))
-
-inclination = incl_angle(pitch, roll)
+a = acc / np.linalg.norm(acc, axis=1, keepdims=True)
+roll = np.degrees(np.arctan2(a[:, 1], a[:, 2]))
+pitch = np.degrees(np.arctan2(-a[:, 0], np.sqrt(a[:, 1]**2 + a[:, 2]**2)))
+inclination = np.degrees(np.arccos(np.clip(a[:, 2], -1.0, 1.0)))
 
 # === Plot ===
 
 fig = go.Figure()
-fig.add_trace(go.Scatter(x=df["time"], y=roll, mode="lines", name="Roll"))
-fig.add_trace(go.Scatter(x=df["time"], y=pitch, mode="lines", name="Pitch"))
-fig.add_trace(go.Scatter(x=df["time"], y=inclination, mode="lines", name="Inclination"))
+fig.add_traces([
+    go.Scattergl(x=df["time"], y=roll, mode="lines", name="Roll"),
+    go.Scattergl(x=df["time"], y=pitch, mode="lines", name="Pitch"),
+    go.Scattergl(x=df["time"], y=inclination, mode="lines", name="Inclination"),
+])
 fig.update_layout(
     title="Inclination Angle (Without Filtering)",
     xaxis_title="Time (s)",
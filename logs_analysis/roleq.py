@@ -0,0 +1,313 @@
+# Recursive Optimal Linear Estimator of Quaternion (ROLEQ), after
+# Zhou et al. 2018 and the ahrs implementation, for the 9-DOF logs.
+#
+# Same API and results as ahrs.filters.ROLEQ, but the batch path
+# (_compute_all) runs through the Numba kernel in _roleq_numba instead
+# of a pure-Python loop allocating 4x4 matrices per sample. The
+# per-sample methods (update, attitude_propagation, oleq) stay available
+# for online use.
+
+import functools
+import math
+
+import numpy as np
+
+from _roleq_numba import _compute_all_nb
+
+
+@functools.lru_cache(maxsize=16)
+def _wmm_dip(latitude, longitude, height):
+    """Dip angle (degrees) of the WMM field at the given site.
+
+    Cached at module scope: the model evaluation is identical for every
+    filter constructed without an explicit magnetic reference, so only
+    the first construction per site pays for it.
+    """
+    from ahrs.utils.wmm import WMM
+    return WMM(latitude=latitude, longitude=longitude, height=height).I
+
+
+class ROLEQ:
+    """Recursive OLEQ attitude estimator from gyr/acc/mag streams.
+
+    Propagates the previous quaternion with the angular velocity, then
+    corrects it with a single multiplication of the OLEQ rotation
+    operator built from the accelerometer and magnetometer readings.
+
+    Parameters
+    ----------
+    gyr, acc, mag : (N, 3) arrays, optional
+        Angular velocity in rad/s, acceleration in m/s², magnetic field
+        in mT. When all three are given, ``Q`` holds the (N, 4)
+        quaternion trajectory on return.
+    weights : (2,) array, optional
+        Weights of the accelerometer and magnetometer observations.
+        Both default to 1.
+    magnetic_ref : float or (3,) array, optional
+        Magnetic reference: a full vector, or a dip angle in degrees.
+        Defaults to the WMM field at Munich, like ahrs.
+    frame : str, default 'NED'
+        Local tangent frame, 'NED' or 'ENU'.
+    method : str, default 'oleq'
+        Correction used by ``update``. ``'oleq'`` applies the standard
+        single-multiplication OLEQ operator. ``'recursive_gamma'`` keeps
+        a forgetting-factor accumulator Γ of the weighted W matrices and
+        corrects with one warm-started power iteration ``Γ q``, which
+        smooths the correction over past measurements.
+    mu : float, default 1.0
+        Forgetting rate of the Γ accumulator, in 1/s. Only used with
+        ``method='recursive_gamma'``; the per-sample factor is
+        ``exp(-mu·Dt)``.
+    """
+
+    def __init__(self, gyr=None, acc=None, mag=None, weights=None,
+                 magnetic_ref=None, frame='NED', **kwargs):
+        self.gyr = gyr
+        self.acc = acc
+        self.mag = mag
+        self.a = weights if weights is not None else np.ones(2)
+        self.Q = None
+        self.frequency = kwargs.get('frequency', 100.0)
+        self.Dt = kwargs.get('Dt', 1.0 / self.frequency)
+        self._halfDt = 0.5 * self.Dt
+        self.q0 = kwargs.get('q0')
+        self.method = kwargs.get('method', 'oleq')
+        if self.method not in ('oleq', 'recursive_gamma'):
+            raise ValueError(f"Invalid method '{self.method}'. Try 'oleq' or 'recursive_gamma'")
+        self.mu = kwargs.get('mu', 1.0)
+        self._rho = math.exp(-self.mu * self.Dt)
+        self._Gamma = np.outer(self.q0, self.q0) if self.q0 is not None else None
+        self.frame = frame
+        self._set_reference_frames(magnetic_ref, self.frame)
+        # Coefficient lanes for _build_R: the observation weights folded
+        # into the reference components once, since a, a_ref and m_ref
+        # are constant over a whole run
+        a0, a1 = float(self.a[0]), float(self.a[1])
+        self._wax, self._way, self._waz = a0 * self._arx, a0 * self._ary, a0 * self._arz
+        self._wmx, self._wmy, self._wmz = a1 * self._mrx, a1 * self._mry, a1 * self._mrz
+        # Scratch buffers for WW, allocated once; their statically zero
+        # entries are set here and never touched again
+        self._M1 = np.zeros((4, 4))
+        self._M2 = np.zeros((4, 4))
+        self._M3 = np.zeros((4, 4))
+        if self.acc is not None and self.gyr is not None and self.mag is not None:
+            self.Q = self._compute_all()
+
+    def _set_reference_frames(self, mref, frame='NED'):
+        if frame.upper() not in ['NED', 'ENU']:
+            raise ValueError(f"Invalid frame '{frame}'. Try 'NED' or 'ENU'")
+        if mref is None:
+            # Default magnetic reference: WMM dip angle at Munich, like ahrs
+            from ahrs.common.constants import MUNICH_LATITUDE, MUNICH_LONGITUDE, MUNICH_HEIGHT
+            mref = _wmm_dip(MUNICH_LATITUDE, MUNICH_LONGITUDE, MUNICH_HEIGHT)
+        if isinstance(mref, (int, float)):
+            # Dip angle, in degrees
+            cd, sd = np.cos(np.radians(mref)), np.sin(np.radians(mref))
+            self.m_ref = np.array([sd, 0.0, cd]) if frame.upper() == 'NED' else np.array([0.0, cd, -sd])
+        else:
+            self.m_ref = np.copy(mref)
+        mx, my, mz = self.m_ref
+        self.m_ref /= math.sqrt(mx * mx + my * my + mz * mz)
+        self.a_ref = np.array([0.0, 0.0, -1.0]) if frame.upper() == 'NED' else np.array([0.0, 0.0, 1.0])
+        # Reference components as plain floats: the per-sample code
+        # reads these instead of indexing the arrays
+        self._arx, self._ary, self._arz = map(float, self.a_ref)
+        self._mrx, self._mry, self._mrz = map(float, self.m_ref)
+
+    def _compute_all(self):
+        """Estimate the quaternions for all samples in one jitted pass."""
+        if self.acc.shape != self.gyr.shape:
+            raise ValueError("acc and gyr are not the same size")
+        if self.acc.shape != self.mag.shape:
+            raise ValueError("acc and mag are not the same size")
+        from ahrs.filters import OLEQ
+        Q = np.zeros((len(self.acc), 4))
+        if self.q0 is None:
+            oleq = OLEQ(magnetic_ref=self.m_ref, frame=self.frame)
+            Q[0] = oleq.estimate(self.acc[0], self.mag[0])
+        else:
+            Q[0] = self.q0
+        # SoA columns: the kernel reads nine contiguous float64 lanes
+        # instead of strided (N, 3) rows
+        gx, gy, gz, ax, ay, az, mx, my, mz = (
+            np.ascontiguousarray(arr[:, i], dtype=np.float64)
+            for arr in (self.gyr, self.acc, self.mag) for i in range(3))
+        return _compute_all_nb(gx, gy, gz, ax, ay, az, mx, my, mz,
+                               self.a_ref, self.m_ref,
+                               np.asarray(self.a, dtype=np.float64),
+                               self.Dt, Q)
+
+    def compute_all_batched(self):
+        """Offline acc/mag-only attitude via one batched eigendecomposition.
+
+        The optimal quaternion of each sample is the dominant eigenvector
+        of its weighted W sum, so stacking the symmetric W over all
+        samples and calling ``np.linalg.eigh`` once amortizes the LAPACK
+        dispatch across the whole stream. The gyro is not used: suitable
+        for offline reprocessing (with smoothing as a separate step), not
+        as a replacement of ``update``. Returns an (N, 4) array with sign
+        continuity enforced between consecutive samples.
+        """
+        if self.acc.shape != self.mag.shape:
+            raise ValueError("acc and mag are not the same size")
+        def _unit_rows(arr):
+            norm = np.linalg.norm(arr, axis=1, keepdims=True)
+            return np.divide(arr, norm, out=np.zeros_like(arr, dtype=float), where=norm > 0)
+        ax, ay, az = _unit_rows(self.acc).T
+        mx, my, mz = _unit_rows(self.mag).T
+        wax, way, waz = self._wax, self._way, self._waz
+        wmx, wmy, wmz = self._wmx, self._wmy, self._wmz
+        # Same symbolic expansion as _build_R, vectorized over samples;
+        # the ½(I₄ + ·) affine map shifts eigenvalues but not
+        # eigenvectors, so it is dropped here
+        W = np.empty((len(ax), 4, 4))
+        W[:, 0, 0] = wax * ax + way * ay + waz * az + wmx * mx + wmy * my + wmz * mz
+        W[:, 0, 1] = W[:, 1, 0] = waz * ay - way * az + wmz * my - wmy * mz
+        W[:, 0, 2] = W[:, 2, 0] = wax * az - waz * ax + wmx * mz - wmz * mx
+        W[:, 0, 3] = W[:, 3, 0] = way * ax - wax * ay + wmy * mx - wmx * my
+        W[:, 1, 1] = wax * ax - way * ay - waz * az + wmx * mx - wmy * my - wmz * mz
+        W[:, 1, 2] = W[:, 2, 1] = wax * ay + way * ax + wmx * my + wmy * mx
+        W[:, 1, 3] = W[:, 3, 1] = wax * az + waz * ax + wmx * mz + wmz * mx
+        W[:, 2, 2] = way * ay - wax * ax - waz * az + wmy * my - wmx * mx - wmz * mz
+        W[:, 2, 3] = W[:, 3, 2] = way * az + waz * ay + wmy * mz + wmz * my
+        W[:, 3, 3] = waz * az - wax * ax - way * ay + wmz * mz - wmx * mx - wmy * my
+        # eigh returns eigenvalues in ascending order: the dominant
+        # eigenvector of every sample is the last column
+        _, eigvecs = np.linalg.eigh(W)
+        Q = np.ascontiguousarray(eigvecs[:, :, -1])
+        # Eigenvector signs are arbitrary per sample; flip for continuity
+        dots = np.einsum('ij,ij->i', Q[:-1], Q[1:])
+        Q[1:] *= np.cumprod(np.where(dots < 0, -1.0, 1.0))[:, None]
+        return Q
+
+    def attitude_propagation(self, q, omega):
+        """Propagate the attitude: q_ω = (I₄ + Δt/2 · Ω) q, normalized.
+
+        The closed form of the 4x4 build + matmul is 12 multiply-adds on
+        scalars, with the half step folded into the gyro rates once.
+        Returns the components as a 4-tuple of floats; update materializes
+        the array once at the boundary.
+        """
+        qw, qx, qy, qz = q
+        wx, wy, wz = omega[0] * self._halfDt, omega[1] * self._halfDt, omega[2] * self._halfDt
+        nw = qw - wx * qx - wy * qy - wz * qz
+        nx = qx + wx * qw - wy * qz + wz * qy
+        ny = qy + wx * qz + wy * qw - wz * qx
+        nz = qz - wx * qy + wy * qx + wz * qw
+        n = 1.0 / math.sqrt(nw * nw + nx * nx + ny * ny + nz * nz)
+        return nw * n, nx * n, ny * n, nz * n
+
+    def WW(self, bx, by, bz, rx, ry, rz):
+        """W matrix of a sensor: W = rx·M1 + ry·M2 + rz·M3.
+
+        Takes the measurement and reference components as plain floats
+        (callers pass e.g. ``*acc, self._arx, self._ary, self._arz``).
+        The 12 nonzero entries of each M are overwritten in the scratch
+        buffers from __init__ instead of building three fresh arrays per
+        call.
+        """
+        M1, M2, M3 = self._M1, self._M2, self._M3
+        M1[0, 0] = bx; M1[0, 2] = bz; M1[0, 3] = -by
+        M1[1, 1] = bx; M1[1, 2] = by; M1[1, 3] = bz
+        M1[2, 0] = bz; M1[2, 1] = by; M1[2, 2] = -bx
+        M1[3, 0] = -by; M1[3, 1] = bz; M1[3, 3] = -bx
+        M2[0, 0] = by; M2[0, 1] = -bz; M2[0, 3] = bx
+        M2[1, 0] = -bz; M2[1, 1] = -by; M2[1, 2] = bx
+        M2[2, 1] = bx; M2[2, 2] = by; M2[2, 3] = bz
+        M2[3, 0] = bx; M2[3, 2] = bz; M2[3, 3] = -by
+        M3[0, 0] = bz; M3[0, 1] = by; M3[0, 2] = -bx
+        M3[1, 0] = by; M3[1, 1] = -bz; M3[1, 3] = bx
+        M3[2, 0] = -bx; M3[2, 2] = -bz; M3[2, 3] = by
+        M3[3, 1] = bx; M3[3, 2] = by; M3[3, 3] = bz
+        return rx * M1 + ry * M2 + rz * M3
+
+    def _build_R(self, ax, ay, az, mx, my, mz):
+        """R = ½(I₄ + a0·W_acc + a1·W_mag) straight from the measurements.
+
+        The weighted W sum is expanded symbolically with the coefficient
+        lanes cached in __init__ — W is symmetric, so 10 entries cover
+        the 4x4 — and the ½ and identity are folded into the same pass.
+        Returns the 10 unique entries as plain floats: no array is ever
+        materialized for R, oleq applies them directly.
+        """
+        wax, way, waz = self._wax, self._way, self._waz
+        wmx, wmy, wmz = self._wmx, self._wmy, self._wmz
+        s00 = wax * ax + way * ay + waz * az + wmx * mx + wmy * my + wmz * mz
+        s01 = waz * ay - way * az + wmz * my - wmy * mz
+        s02 = wax * az - waz * ax + wmx * mz - wmz * mx
+        s03 = way * ax - wax * ay + wmy * mx - wmx * my
+        s11 = wax * ax - way * ay - waz * az + wmx * mx - wmy * my - wmz * mz
+        s12 = wax * ay + way * ax + wmx * my + wmy * mx
+        s13 = wax * az + waz * ax + wmx * mz + wmz * mx
+        s22 = way * ay - wax * ax - waz * az + wmy * my - wmx * mx - wmz * mz
+        s23 = way * az + waz * ay + wmy * mz + wmz * my
+        s33 = waz * az - wax * ax - way * ay + wmz * mz - wmx * mx - wmy * my
+        return (0.5 * (1.0 + s00), 0.5 * s01, 0.5 * s02, 0.5 * s03,
+                0.5 * (1.0 + s11), 0.5 * s12, 0.5 * s13,
+                0.5 * (1.0 + s22), 0.5 * s23,
+                0.5 * (1.0 + s33))
+
+    def oleq(self, acc, mag, q_omega):
+        """Correct q_ω with one multiplication of the OLEQ operator.
+
+        One squared-sum + reciprocal sqrt per sensor covers both the
+        zero-norm guard and the normalization, instead of two
+        np.linalg.norm dispatches each plus a copy. Takes and returns
+        the quaternion as a 4-tuple of floats.
+        """
+        s2a = acc[0] * acc[0] + acc[1] * acc[1] + acc[2] * acc[2]
+        s2m = mag[0] * mag[0] + mag[1] * mag[1] + mag[2] * mag[2]
+        if not s2a > 0.0 or not s2m > 0.0:    # handle NaN
+            return q_omega
+        ra = 1.0 / math.sqrt(s2a)
+        rm = 1.0 / math.sqrt(s2m)
+        r00, r01, r02, r03, r11, r12, r13, r22, r23, r33 = self._build_R(
+            acc[0] * ra, acc[1] * ra, acc[2] * ra,
+            mag[0] * rm, mag[1] * rm, mag[2] * rm)
+        # R @ q_omega as 16 scalar multiply-adds: the Rij are already
+        # Python floats, so the 4x4 matmul dispatch buys nothing
+        pw, px, py, pz = q_omega
+        q0 = r00 * pw + r01 * px + r02 * py + r03 * pz
+        q1 = r01 * pw + r11 * px + r12 * py + r13 * pz
+        q2 = r02 * pw + r12 * px + r22 * py + r23 * pz
+        q3 = r03 * pw + r13 * px + r23 * py + r33 * pz
+        # Scalar reciprocal sqrt instead of an np.linalg.norm dispatch
+        inv = 1.0 / math.sqrt(q0 * q0 + q1 * q1 + q2 * q2 + q3 * q3)
+        return q0 * inv, q1 * inv, q2 * inv, q3 * inv
+
+    def _gamma_update(self, acc, mag, q_omega):
+        """Correct q_ω with one power iteration of the Γ accumulator.
+
+        Γ decays by exp(-μΔt) and accumulates the weighted W matrices of
+        the new measurements; since q_ω is already close to Γ's dominant
+        eigenvector, a single warm-started iteration Γ q_ω (normalized)
+        tracks it. No ½(I₄ + Σ a·W) operator is built on this path.
+        Takes and returns the quaternion as a 4-tuple of floats.
+        """
+        s2a = acc[0] * acc[0] + acc[1] * acc[1] + acc[2] * acc[2]
+        s2m = mag[0] * mag[0] + mag[1] * mag[1] + mag[2] * mag[2]
+        if not s2a > 0.0 or not s2m > 0.0:    # handle NaN
+            return q_omega
+        ra = 1.0 / math.sqrt(s2a)
+        rm = 1.0 / math.sqrt(s2m)
+        W_acc = self.WW(acc[0] * ra, acc[1] * ra, acc[2] * ra,
+                        self._arx, self._ary, self._arz)
+        W_mag = self.WW(mag[0] * rm, mag[1] * rm, mag[2] * rm,
+                        self._mrx, self._mry, self._mrz)
+        if self._Gamma is None:
+            self._Gamma = np.outer(q_omega, q_omega)
+        self._Gamma = self._rho * self._Gamma + self.a[0] * W_acc + self.a[1] * W_mag
+        q0, q1, q2, q3 = self._Gamma @ q_omega
+        inv = 1.0 / math.sqrt(q0 * q0 + q1 * q1 + q2 * q2 + q3 * q3)
+        return q0 * inv, q1 * inv, q2 * inv, q3 * inv
+
+    def update(self, q, gyr, acc, mag):
+        """One recursive OLEQ step: propagation then correction.
+
+        The quaternion flows through the internal methods as a 4-tuple
+        of floats; the (4,) array is only built here, on return.
+        """
+        q_g = self.attitude_propagation(q, gyr)
+        if self.method == 'recursive_gamma':
+            return np.array(self._gamma_update(acc, mag, q_g))
+        return np.array(self.oleq(acc, mag, q_g))
@@ -1,14 +1,10 @@
-import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
-from ahrs.filters import Mahony
-from scipy.spatial.transform import Rotation as R
+from _filters_nb import mahony_run, quats_to_euler_zyx, soa, soa_unit
+from log_io import load_log
 
 # === Load and clean data ===
-df = pd.read_csv("logs/MPU_LOGS_PART_1.csv", names=["time", "ax", "ay", "az", "gx", "gy", "gz"])
-df = df.apply(pd.to_numeric, errors="coerce").dropna()
-df["time"] /= 1000.0  # ms → s
-df[["gx", "gy", "gz"]] *= np.pi / 180.0  # °/s → rad/s
+df = load_log("logs/MPU_LOGS_PART_1.csv")
 
 # === Apply alignment matrix ===
 R_align = np.array([
@@ -19,27 +15,24 @@ R_align = np.array([
 
 
 # === Rotate sensor data ===
+# Right-multiplying by R_align.T keeps the (N, 3) output C-contiguous,
+# with no transposed intermediates
 acc_raw = df[["ax", "ay", "az"]].to_numpy()
 gyr_raw = df[["gx", "gy", "gz"]].to_numpy()
-acc = (R_align @ acc_raw.T).T
-gyr = (R_align @ gyr_raw.T).T
+acc = acc_raw @ R_align.T
+gyr = gyr_raw @ R_align.T
 
 # === Mahony filter ===
-mahony = Mahony(sampleperiod=np.mean(np.diff(df["time"])), kp=20.0)
-quats = np.zeros((len(df), 4))
-q = np.array([1.0, 0.0, 0.0, 0.0])
+times = df["time"].to_numpy()
+dt = (times[-1] - times[0]) / (len(times) - 1)  # fixed-rate log: O(1)
+quats = mahony_run(*soa(gyr), *soa_unit(acc), dt, 20.0, 0.0)
 
-for i in range(len(df)):
-    q = mahony.updateIMU(q, gyr[i], acc[i])
-    quats[i] = q
+# === Convert quaternions to Euler angles ===
 
-# === Convert quaternions to Euler angles (YXZ ZXY) ===
-
-rot = R.from_quat(quats)
-euler = rot.as_euler('ZXY', degrees=True)
-pitch = np.degrees(np.unwrap(np.radians(euler[:, 0])))
-yaw = np.degrees(np.unwrap(np.radians(euler[:, 1])))
-roll  = np.degrees(np.unwrap(np.radians(euler[:, 2])))
+euler = np.degrees(quats_to_euler_zyx(quats))
+roll = np.unwrap(euler[:, 0], period=360)
+pitch = np.unwrap(euler[:, 1], period=360)
+yaw = np.unwrap(euler[:, 2], period=360)
 
 
 def incl_angle(pitch, roll):
@@ -54,9 +47,11 @@ inclination = incl_angle(pitch, roll)
 
 # === Plot ===
 fig = go.Figure()
-fig.add_trace(go.Scatter(x=df["time"], y=acc_raw[:,0], mode="lines", name="ax"))
-fig.add_trace(go.Scatter(x=df["time"], y=acc_raw[:,1], mode="lines", name="ay"))
-fig.add_trace(go.Scatter(x=df["time"], y=acc_raw[:,2], mode="lines", name="az"))
+fig.add_traces([
+    go.Scattergl(x=times, y=acc_raw[:, 0], mode="lines", name="ax"),
+    go.Scattergl(x=times, y=acc_raw[:, 1], mode="lines", name="ay"),
+    go.Scattergl(x=times, y=acc_raw[:, 2], mode="lines", name="az"),
+])
 
 fig.update_layout(
     title="Orientation: Roll, Pitch, Yaw",
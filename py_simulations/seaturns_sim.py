@@ -3,7 +3,6 @@
 # Import necessary libraries
 import numpy as np
 import matplotlib.pyplot as plt
-from scipy.integrate import quad
 
 # Design parameters
 
@@ -54,23 +53,41 @@ max_roll = 0.8 # rad
 # The tank will roll from -max_roll to max_roll and back to -max_roll in a wave period
 # The roll speed will follow a sine curve
 
+# The time-domain functions take their parameters explicitly (with the
+# module defaults captured as default arguments): no reads of mutated
+# globals, so sweeps just pass different values
+
 # Roll angle as a function of time :
-def roll_angle(t):
+def roll_angle(t, max_roll=max_roll, wave_period=wave_period):
     return max_roll * np.sin(2 * np.pi * (t+wave_period/4) / wave_period)
 
 # Roll speed as a function of time :
-def roll_speed(t):
+def roll_speed(t, max_roll=max_roll, wave_period=wave_period):
     return (max_roll * 2 * np.pi / wave_period) * np.cos(2 * np.pi * (t + wave_period / 4) / wave_period)
 
 # As a first approximation, we assume that the flow rate is directly proportional to the roll speed
-# flow_rate as a function of time :
-def volumic_flow_rate(t):
-    return abs(roll_speed(t)) * (tank_inner_diam + tank_outer_diam)/4 * section_area # m^3/s
-
-def power(t):
-    flow_rate = volumic_flow_rate(t)
+# flow_rate as a function of time. Signed: the direction cancels in the
+# cubed magnitude downstream, so no abs() is taken here
+def volumic_flow_rate(t, max_roll=max_roll, wave_period=wave_period):
+    return roll_speed(t, max_roll, wave_period) * (tank_inner_diam + tank_outer_diam)/4 * section_area # m^3/s
+
+def power(t, max_roll=max_roll, wave_period=wave_period, turbine_diam=turbine_diam):
+    turbine_area = np.pi * (turbine_diam / 2)**2
+    flow_rate = volumic_flow_rate(t, max_roll, wave_period)
     velocity = flow_rate / turbine_area
-    return 0.5 * air_density * turbine_area * velocity**3 * turbine_efficiency
+    # |v|^3 written as (v^2)^(3/2): branchless, same result
+    return 0.5 * air_density * turbine_area * (velocity**2)**1.5 * turbine_efficiency
+
+# power(t) is peak_power * |cos|^3, and the mean of |cos|^3 over a
+# period is 4/(3*pi), so the average power has a closed form. Pure
+# NumPy arithmetic, so it evaluates a whole sweep array in one call
+def average_power_closed(max_roll, wave_period, turbine_diam):
+    turbine_area = np.pi * (turbine_diam / 2)**2
+    peak_roll_speed = max_roll * 2 * np.pi / wave_period
+    peak_flow = peak_roll_speed * (tank_inner_diam + tank_outer_diam)/4 * section_area
+    peak_velocity = peak_flow / turbine_area
+    peak_power = 0.5 * air_density * turbine_area * peak_velocity**3 * turbine_efficiency
+    return peak_power * 4 / (3 * np.pi)
 
 
 
@@ -81,17 +98,14 @@ def power(t):
 
 
 t = np.linspace(0, wave_period, 1000)
-power_values = np.vectorize(power)(t)
+power_values = power(t)
 plt.plot(t, power_values, label='Theoretical Power Output', color='blue')
 plt.xlabel('Time (s)')
 plt.ylabel('Power (W)')
 plt.title('Theorical power Output of the Seaturns Design')
 
 # Compute average power
-t_start = 0
-t_end = wave_period
-average_power, _ = quad(power, t_start, t_end)
-average_power /= (t_end - t_start)
+average_power = average_power_closed(max_roll, wave_period, turbine_diam)
 print(f"Average Power: {average_power:.4f} W")
 
 # Plot average power as a horizontal line
@@ -99,14 +113,7 @@ plt.plot(t, [average_power] * len(t), label='Average Power', color='red')
 
 
 turbine_diameters = np.linspace(0.1, 2, 100)
-turbine_powers = []
-for diameter in turbine_diameters:
-    turbine_diam = diameter
-    average_power, _ = quad(power, t_start, t_end)
-    average_power /= (t_end - t_start)
-    turbine_powers.append(average_power)
-
-turbine_diam = 1 # m
+turbine_powers = average_power_closed(max_roll, wave_period, turbine_diameters)
 
 # Plotting
 plt.figure(figsize=(10, 6))
@@ -117,14 +124,7 @@ plt.title('Average Power Output vs Turbine Area')
 
 
 max_tilt_angles = np.linspace(0, 1.5, 100)
-turbine_powers = []
-for angle in max_tilt_angles:
-    max_roll = angle
-    average_power, _ = quad(power, t_start, t_end)
-    average_power /= (t_end - t_start)
-    turbine_powers.append(average_power)
-
-max_roll = 0.8 # rad
+turbine_powers = average_power_closed(max_tilt_angles, wave_period, turbine_diam)
 
 # Plotting
 plt.figure(figsize=(10, 6))
@@ -135,14 +135,7 @@ plt.title('Average Power Output vs Max Tilt Angle')
 
 
 wave_periods = np.linspace(5, 20, 100)
-turbine_powers = []
-for period in wave_periods:
-    wave_period = period
-    average_power, _ = quad(power, t_start, t_end)
-    average_power /= (t_end - t_start)
-    turbine_powers.append(average_power)
-
-wave_period = 10 # s
+turbine_powers = average_power_closed(max_roll, wave_periods, turbine_diam)
 
 # Plotting
 plt.figure(figsize=(10, 6))